@@ -5,16 +5,33 @@ Runs daily via GitHub Actions at 5 AM
 """
 
 import os
-import json
+import re
+import html
 import time
+import shelve
+import asyncio
+import hashlib
+import math
+import queue
+import logging
 import smtplib
-import requests
+import aiohttp
+import orjson
 import anthropic
+from collections import Counter, defaultdict
 from datetime import datetime
+from logging.handlers import QueueHandler, QueueListener
+from urllib.parse import quote, urlparse
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
+import soupsieve as sv
 from bs4 import BeautifulSoup
 
+try:
+    import uvloop  # faster event loop; not available on Windows
+except ImportError:
+    uvloop = None
+
 # ─────────────────────────────────────────────
 # CONFIG — edit these to match your preferences
 # ─────────────────────────────────────────────
@@ -26,8 +43,12 @@ CONFIG = {
     "gmail_app_password": os.environ.get("GMAIL_APP_PASSWORD", ""),
     "anthropic_api_key": os.environ.get("ANTHROPIC_API_KEY", ""),
     "resume_text": os.environ.get("RESUME_TEXT", ""),  # paste resume as plain text in GitHub secret
+    "prefilter_keep_ratio": float(os.environ.get("PREFILTER_KEEP_RATIO", "0.75")),  # share of jobs sent to Claude
+    "cache_dir": os.environ.get("JOB_CACHE_DIR", ".job_cache"),  # persisted between runs by GitHub Actions
 }
 
+log = logging.getLogger("jobsearch")
+
 HEADERS = {
     "User-Agent": (
         "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) "
@@ -36,146 +57,233 @@ HEADERS = {
     )
 }
 
+TAG_RE = re.compile(r"<[^>]+>")  # strips markup from RemoteOK's short descriptions
+WORD_RE = re.compile(r"[a-z0-9+#]+")
+
+# CSS selectors, compiled once instead of on every card
+INDEED_CARDS = sv.compile(".job_seen_beacon")
+INDEED_CARDS_FALLBACK = sv.compile("[data-jk]")
+INDEED_TITLE = sv.compile(".jobTitle span, h2.jobTitle")
+INDEED_COMPANY = sv.compile(".companyName, [data-testid='company-name']")
+INDEED_LOCATION = sv.compile(".companyLocation, [data-testid='text-location']")
+INDEED_LINK = sv.compile("a[href*='/rc/clk'], a[id*='job_']")
+
+LINKEDIN_CARDS = sv.compile(".jobs-search__results-list li, .base-card")
+LINKEDIN_TITLE = sv.compile(".base-search-card__title, h3.base-search-card__title")
+LINKEDIN_COMPANY = sv.compile(".base-search-card__subtitle, a.hidden-nested-link")
+LINKEDIN_LOCATION = sv.compile(".job-search-card__location")
+LINKEDIN_LINK = sv.compile("a.base-card__full-link, a[href*='linkedin.com/jobs/view']")
+
+DESCRIPTION_SELECTORS = {
+    "LinkedIn": [sv.compile(".description__text"), sv.compile(".show-more-less-html__markup")],
+    "Indeed": [sv.compile("#jobDescriptionText"), sv.compile(".jobsearch-jobDescriptionText")],
+    "RemoteOK": [sv.compile(".description")],
+}
+
+SCORE_CACHE_TTL = 7 * 86400  # re-score a still-open posting once a week
+PAGE_CACHE_TTL = 86400  # re-fetch a job page's description once a day
+SCORE_BATCH_SIZE = 8  # jobs scored per Claude request
+PRESCREEN_MODEL = "claude-haiku-4-5"  # cheap first pass over every job
+SCORE_MODEL = "claude-opus-4-6"  # detailed analysis for finalists only
+PRESCREEN_MARGIN = 5  # jobs pre-scored this far below min_match_score still get a detailed look
+DETAIL_MARGIN = 10  # skip detailed analysis for jobs scoring this far below min_match_score
+CLAUDE_CONCURRENCY = 5  # max in-flight Claude requests
+HOST_CONCURRENCY = 5  # max in-flight requests per host — be polite, avoid rate limiting
+HOST_MIN_INTERVAL = 1.0  # seconds between request starts to the same host
+MAX_RETRIES = 3
+RETRY_BACKOFF = 0.5  # seconds, doubled after each failed attempt
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+_host_semaphores = defaultdict(lambda: asyncio.Semaphore(HOST_CONCURRENCY))
+_host_next_slot = defaultdict(float)
+
+
+def host_semaphore(url):
+    """Semaphore that bounds concurrent requests to the host serving `url`."""
+    return _host_semaphores[urlparse(url).netloc]
+
+
+async def wait_for_host_slot(url):
+    """Space out request starts to the same host; requests to different hosts never wait on each other."""
+    host = urlparse(url).netloc
+    now = time.monotonic()
+    slot = max(now, _host_next_slot[host])
+    _host_next_slot[host] = slot + HOST_MIN_INTERVAL
+    await asyncio.sleep(slot - now)
+
+
+async def fetch(session, url, as_json=False, **kwargs):
+    """GET `url` within its host's concurrency and rate limits, retrying transient failures with backoff."""
+    for attempt in range(MAX_RETRIES + 1):
+        try:
+            async with host_semaphore(url):
+                await wait_for_host_slot(url)
+                async with session.get(url, **kwargs) as res:
+                    if res.status not in RETRY_STATUSES or attempt == MAX_RETRIES:
+                        return await res.json(content_type=None) if as_json else await res.text()
+        except (aiohttp.ClientConnectionError, asyncio.TimeoutError):
+            if attempt == MAX_RETRIES:
+                raise
+        await asyncio.sleep(RETRY_BACKOFF * 2 ** attempt)
+
 
 # ─────────────────────────────────────────────
 # SCRAPERS
 # ─────────────────────────────────────────────
 
-def scrape_remoteok(keywords):
+def parse_remoteok(data):
+    """Turn the RemoteOK API payload into job dicts."""
+    jobs = []
+    # First item is metadata, skip it
+    for job in data[1:21]:
+        jobs.append({
+            "title": job.get("position", "Unknown"),
+            "company": job.get("company", "Unknown"),
+            "location": job.get("location", "Remote"),
+            "description": html.unescape(TAG_RE.sub(" ", job.get("description", ""))).strip()[:2000],
+            "url": job.get("url", f"https://remoteok.com/remote-jobs/{job.get('id','')}"),
+            "source": "RemoteOK",
+            "salary": job.get("salary", ""),
+        })
+    return jobs
+
+
+async def scrape_remoteok(session, keywords):
     """RemoteOK has a free public JSON API — most reliable source."""
-    print("🔍 Scraping RemoteOK...")
+    log.info("🔍 Scraping RemoteOK...")
     jobs = []
     try:
         tag = keywords.strip().replace(" ", "-")
         url = f"https://remoteok.com/api?tag={tag}"
-        res = requests.get(url, headers=HEADERS, timeout=15)
-        data = res.json()
-
-        # First item is metadata, skip it
-        for job in data[1:21]:
-            jobs.append({
-                "title": job.get("position", "Unknown"),
-                "company": job.get("company", "Unknown"),
-                "location": job.get("location", "Remote"),
-                "description": BeautifulSoup(job.get("description", ""), "html.parser").get_text()[:2000],
-                "url": job.get("url", f"https://remoteok.com/remote-jobs/{job.get('id','')}"),
-                "source": "RemoteOK",
-                "salary": job.get("salary", ""),
-            })
-        print(f"   ✅ Found {len(jobs)} jobs on RemoteOK")
+        data = await fetch(session, url, as_json=True)
+
+        jobs = parse_remoteok(data)
+        log.info(f"   ✅ Found {len(jobs)} jobs on RemoteOK")
     except Exception as e:
-        print(f"   ❌ RemoteOK error: {e}")
+        log.error(f"   ❌ RemoteOK error: {e}")
     return jobs
 
 
-def scrape_indeed(keywords, location):
+def parse_indeed(page, location):
+    """Extract job cards from an Indeed search results page."""
+    soup = BeautifulSoup(page, "lxml")
+    jobs = []
+
+    cards = INDEED_CARDS.select(soup) or INDEED_CARDS_FALLBACK.select(soup)
+    for card in cards[:20]:
+        title_el = INDEED_TITLE.select_one(card)
+        company_el = INDEED_COMPANY.select_one(card)
+        location_el = INDEED_LOCATION.select_one(card)
+        link_el = INDEED_LINK.select_one(card)
+
+        title = title_el.get_text(strip=True) if title_el else None
+        if not title:
+            continue
+
+        jobs.append({
+            "title": title,
+            "company": company_el.get_text(strip=True) if company_el else "Unknown",
+            "location": location_el.get_text(strip=True) if location_el else location,
+            "description": "",  # fetched separately
+            "url": "https://indeed.com" + link_el["href"] if link_el and link_el.get("href", "").startswith("/") else (link_el["href"] if link_el else ""),
+            "source": "Indeed",
+            "salary": "",
+        })
+    return jobs
+
+
+async def scrape_indeed(session, keywords, location):
     """Scrape Indeed job listings."""
-    print("🔍 Scraping Indeed...")
+    log.info("🔍 Scraping Indeed...")
     jobs = []
     try:
         url = (
             f"https://www.indeed.com/jobs"
-            f"?q={requests.utils.quote(keywords)}"
-            f"&l={requests.utils.quote(location)}"
+            f"?q={quote(keywords)}"
+            f"&l={quote(location)}"
             f"&fromage=1"  # last 24 hours
         )
-        res = requests.get(url, headers=HEADERS, timeout=15)
-        soup = BeautifulSoup(res.text, "html.parser")
-
-        cards = soup.select(".job_seen_beacon") or soup.select("[data-jk]")
-        for card in cards[:20]:
-            title_el = card.select_one(".jobTitle span, h2.jobTitle")
-            company_el = card.select_one(".companyName, [data-testid='company-name']")
-            location_el = card.select_one(".companyLocation, [data-testid='text-location']")
-            link_el = card.select_one("a[href*='/rc/clk'], a[id*='job_']")
-
-            title = title_el.get_text(strip=True) if title_el else None
-            if not title:
-                continue
+        page = await fetch(session, url)
 
-            jobs.append({
-                "title": title,
-                "company": company_el.get_text(strip=True) if company_el else "Unknown",
-                "location": location_el.get_text(strip=True) if location_el else location,
-                "description": "",  # fetched separately
-                "url": "https://indeed.com" + link_el["href"] if link_el and link_el.get("href", "").startswith("/") else (link_el["href"] if link_el else ""),
-                "source": "Indeed",
-                "salary": "",
-            })
-
-        print(f"   ✅ Found {len(jobs)} jobs on Indeed")
+        jobs = await asyncio.to_thread(parse_indeed, page, location)
+        log.info(f"   ✅ Found {len(jobs)} jobs on Indeed")
     except Exception as e:
-        print(f"   ❌ Indeed error: {e}")
+        log.error(f"   ❌ Indeed error: {e}")
+    return jobs
+
+
+def parse_linkedin(page, location):
+    """Extract job cards from a LinkedIn search results page."""
+    soup = BeautifulSoup(page, "lxml")
+    jobs = []
+
+    cards = LINKEDIN_CARDS.select(soup)
+    for card in cards[:20]:
+        title_el = LINKEDIN_TITLE.select_one(card)
+        company_el = LINKEDIN_COMPANY.select_one(card)
+        location_el = LINKEDIN_LOCATION.select_one(card)
+        link_el = LINKEDIN_LINK.select_one(card)
+
+        title = title_el.get_text(strip=True) if title_el else None
+        if not title:
+            continue
+
+        jobs.append({
+            "title": title,
+            "company": company_el.get_text(strip=True) if company_el else "Unknown",
+            "location": location_el.get_text(strip=True) if location_el else location,
+            "description": "",
+            "url": link_el["href"].split("?")[0] if link_el and link_el.get("href") else "",
+            "source": "LinkedIn",
+            "salary": "",
+        })
     return jobs
 
 
-def scrape_linkedin(keywords, location):
+async def scrape_linkedin(session, keywords, location):
     """Scrape LinkedIn job listings."""
-    print("🔍 Scraping LinkedIn...")
+    log.info("🔍 Scraping LinkedIn...")
     jobs = []
     try:
         url = (
             f"https://www.linkedin.com/jobs/search/"
-            f"?keywords={requests.utils.quote(keywords)}"
-            f"&location={requests.utils.quote(location)}"
+            f"?keywords={quote(keywords)}"
+            f"&location={quote(location)}"
             f"&f_TPR=r86400"  # last 24 hours
             f"&position=1&pageNum=0"
         )
-        res = requests.get(url, headers=HEADERS, timeout=15)
-        soup = BeautifulSoup(res.text, "html.parser")
-
-        cards = soup.select(".jobs-search__results-list li, .base-card")
-        for card in cards[:20]:
-            title_el = card.select_one(".base-search-card__title, h3.base-search-card__title")
-            company_el = card.select_one(".base-search-card__subtitle, a.hidden-nested-link")
-            location_el = card.select_one(".job-search-card__location")
-            link_el = card.select_one("a.base-card__full-link, a[href*='linkedin.com/jobs/view']")
-
-            title = title_el.get_text(strip=True) if title_el else None
-            if not title:
-                continue
+        page = await fetch(session, url)
 
-            jobs.append({
-                "title": title,
-                "company": company_el.get_text(strip=True) if company_el else "Unknown",
-                "location": location_el.get_text(strip=True) if location_el else location,
-                "description": "",
-                "url": link_el["href"].split("?")[0] if link_el and link_el.get("href") else "",
-                "source": "LinkedIn",
-                "salary": "",
-            })
-
-        print(f"   ✅ Found {len(jobs)} jobs on LinkedIn")
+        jobs = await asyncio.to_thread(parse_linkedin, page, location)
+        log.info(f"   ✅ Found {len(jobs)} jobs on LinkedIn")
     except Exception as e:
-        print(f"   ❌ LinkedIn error: {e}")
+        log.error(f"   ❌ LinkedIn error: {e}")
     return jobs
 
 
-def fetch_job_description(url, source):
+def parse_job_description(page, source):
+    """Extract the description text from an individual job page."""
+    soup = BeautifulSoup(page, "lxml")
+
+    # Try source-specific selectors first
+    for sel in DESCRIPTION_SELECTORS.get(source, []):
+        el = sel.select_one(soup)
+        if el:
+            return el.get_text(separator=" ", strip=True)[:2500]
+
+    # Fallback: get body text
+    for tag in soup(["script", "style", "nav", "header", "footer"]):
+        tag.decompose()
+    return soup.get_text(separator=" ", strip=True)[:2500]
+
+
+async def fetch_job_description(session, url, source):
     """Fetch the full job description from individual job pages."""
     if not url:
         return ""
     try:
-        time.sleep(2)  # be polite, avoid rate limiting
-        res = requests.get(url, headers=HEADERS, timeout=10)
-        soup = BeautifulSoup(res.text, "html.parser")
-
-        # Try source-specific selectors first
-        selectors = {
-            "LinkedIn": [".description__text", ".show-more-less-html__markup"],
-            "Indeed": ["#jobDescriptionText", ".jobsearch-jobDescriptionText"],
-            "RemoteOK": [".description"],
-        }
-
-        for sel in selectors.get(source, []):
-            el = soup.select_one(sel)
-            if el:
-                return el.get_text(separator=" ", strip=True)[:2500]
-
-        # Fallback: get body text
-        for tag in soup(["script", "style", "nav", "header", "footer"]):
-            tag.decompose()
-        return soup.get_text(separator=" ", strip=True)[:2500]
+        page = await fetch(session, url, timeout=aiohttp.ClientTimeout(total=10))
+        # Parsing is CPU-bound — run it in a worker thread so other fetches keep flowing
+        return await asyncio.to_thread(parse_job_description, page, source)
 
     except Exception:
         return ""
@@ -193,64 +301,252 @@ def deduplicate(jobs):
     return unique
 
 
+def shingles(text, size=3):
+    """Character shingles used to compare job postings."""
+    return {text[i:i + size] for i in range(max(len(text) - size + 1, 1))}
+
+
+def remove_near_duplicates(jobs, threshold=0.85):
+    """Drop reposts whose title + company + description are nearly identical.
+
+    Catches the same posting re-listed with a reworded title or lightly edited text, which
+    slips past deduplicate(); of each near-duplicate pair, the job with the longer description
+    is kept. Jobs without a description are never compared — title + company alone can't tell
+    "Software Engineer II" from "Software Engineer III".
+    """
+    kept, kept_shingles = [], []
+    for job in jobs:
+        description = job.get("description", "")
+        sh = shingles(f"{job['title']} {job['company']} {description}".lower())
+        for i, other in enumerate(kept_shingles):
+            if not description or not kept[i].get("description"):
+                continue
+            if len(sh & other) / len(sh | other) >= threshold:
+                if len(description) > len(kept[i]["description"]):
+                    kept[i], kept_shingles[i] = job, sh
+                break
+        else:
+            kept.append(job)
+            kept_shingles.append(sh)
+    return kept
+
+
+def prefilter_by_similarity(jobs, resume_text, keep_ratio):
+    """Keep the `keep_ratio` share of jobs most similar (TF-IDF cosine) to the resume, in original order.
+
+    Cheap first pass so obvious non-matches never cost a Claude call.
+    """
+    if not resume_text or keep_ratio >= 1 or len(jobs) < 2:
+        return jobs
+
+    texts = [resume_text] + [f"{job['title']} {job.get('description', '')}" for job in jobs]
+    docs = [Counter(WORD_RE.findall(text.lower())) for text in texts]
+    doc_freq = Counter(term for doc in docs for term in doc)
+    idf = {term: math.log((1 + len(docs)) / (1 + n)) + 1 for term, n in doc_freq.items()}
+
+    vectors = []
+    for doc in docs:
+        vec = {term: count * idf[term] for term, count in doc.items()}
+        norm = math.sqrt(sum(w * w for w in vec.values())) or 1.0
+        vectors.append({term: w / norm for term, w in vec.items()})
+
+    resume_vec = vectors[0]
+    similarity = [sum(w * resume_vec.get(term, 0.0) for term, w in vec.items()) for vec in vectors[1:]]
+    keep = max(1, math.ceil(len(jobs) * keep_ratio))
+    top = sorted(range(len(jobs)), key=similarity.__getitem__, reverse=True)[:keep]
+    return [jobs[i] for i in sorted(top)]
+
+
+# ─────────────────────────────────────────────
+# DISK CACHE
+# ─────────────────────────────────────────────
+
+def open_cache(name):
+    """Open a persistent cache under CONFIG["cache_dir"], dropping expired entries."""
+    os.makedirs(CONFIG["cache_dir"], exist_ok=True)
+    cache = shelve.open(os.path.join(CONFIG["cache_dir"], name))
+    now = time.time()
+    for key in [k for k, entry in cache.items() if entry["expires"] < now]:
+        del cache[key]
+    return cache
+
+
+def cache_get(cache, key):
+    entry = cache.get(key)
+    return entry["value"] if entry else None
+
+
+def cache_set(cache, key, value, ttl):
+    cache[key] = {"expires": time.time() + ttl, "value": value}
+
+
 # ─────────────────────────────────────────────
 # CLAUDE AI SCORING
 # ─────────────────────────────────────────────
 
-def score_job_with_claude(job, resume_text, keywords, client):
-    """Send job + resume to Claude and get a match score + analysis."""
-    prompt = f"""You are an expert career advisor. Analyze this job posting against the candidate's resume and keywords.
+FALLBACK_ANALYSIS = {
+    "match_score": 0,
+    "keyword_match": 0,
+    "recommendation": "Review Manually",
+    "match_reasons": "Could not analyze.",
+    "top_matching_skills": "",
+    "missing_skills": "",
+    "cover_letter_hook": ""
+}
+
+SCORING_INSTRUCTIONS = """You are an expert career advisor. Analyze each job posting the user sends against the candidate's resume and keywords below.
+
+## YOUR TASK:
+The postings are numbered ## JOB 1, ## JOB 2, ... First score every posting, then give full details only for postings whose match_score is at or above the detail threshold stated after the postings.
+Return ONLY a valid JSON object with NO markdown, NO backticks, NO explanation:
+
+{
+  "scores": [
+    {"job_id": <the posting's number>, "match_score": <integer 0-100>}
+  ],
+  "results": [
+    {
+      "job_id": <the posting's number>,
+      "match_score": <same score as above>,
+      "keyword_match": <integer 0-100>,
+      "recommendation": "<Apply Now | Strong Match | Consider Applying | Low Match | Skip>",
+      "match_reasons": "<2-3 sentence explanation>",
+      "top_matching_skills": "<comma-separated skills that match>",
+      "missing_skills": "<comma-separated important skills the candidate may lack>",
+      "cover_letter_hook": "<one compelling opening sentence for a cover letter>"
+    }
+  ]
+}"""
+
+PRESCREEN_INSTRUCTIONS = """You are an expert career advisor. Quickly score each job posting the user sends against the candidate's resume and keywords below.
+
+## YOUR TASK:
+The postings are numbered ## JOB 1, ## JOB 2, ... Return ONLY a valid JSON object with NO markdown, NO backticks, NO explanation:
+
+{
+  "scores": [
+    {"job_id": <the posting's number>, "match_score": <integer 0-100>}
+  ]
+}"""
+
+LOW_MATCH_REASON = "Below your minimum match score."
+PRESCREEN_REASON = "Pre-screened below your minimum match score."
+
+JOB_SCORE_RE = re.compile(r'"job_id"\s*:\s*(\d+)\s*,\s*"match_score"\s*:\s*(\d+)')
+
+
+def build_system_prompt(resume_text, keywords, instructions=SCORING_INSTRUCTIONS):
+    """Stable prompt prefix shared by every job, marked for Claude's prompt cache.
+
+    Claude only caches a prefix that reaches the model's minimum cacheable length (several
+    thousand tokens for Opus and Haiku). The instructions plus a resume trimmed to 3500 chars
+    usually fall short, in which case the marker is ignored and the prefix is billed normally.
+    """
+    return [
+        {"type": "text", "text": instructions},
+        {
+            "type": "text",
+            "text": f"## CANDIDATE RESUME:\n{resume_text[:3500]}\n\n## TARGET KEYWORDS:\n{keywords}",
+            "cache_control": {"type": "ephemeral"},
+        },
+    ]
 
-## CANDIDATE RESUME:
-{resume_text[:3500]}
 
-## TARGET KEYWORDS:
-{keywords}
+def score_cache_key(job, resume_text, keywords):
+    """Content hash of everything that influences a job's score."""
+    content = resume_text[:3500] + keywords + job["title"] + job["company"] + job.get("description", "")[:2000]
+    return hashlib.sha256(content.encode()).hexdigest()
 
-## JOB POSTING:
+
+def format_job(job_id, job):
+    return f"""## JOB {job_id}:
 Title: {job['title']}
 Company: {job['company']}
 Location: {job['location']}
 Source: {job['source']}
-Description: {job.get('description', 'Not available')[:2000]}
+Description: {job.get('description', 'Not available')[:2000]}"""
 
-## YOUR TASK:
-Return ONLY a valid JSON object with NO markdown, NO backticks, NO explanation:
 
-{{
-  "match_score": <integer 0-100>,
-  "keyword_match": <integer 0-100>,
-  "recommendation": "<Apply Now | Strong Match | Consider Applying | Low Match | Skip>",
-  "match_reasons": "<2-3 sentence explanation>",
-  "top_matching_skills": "<comma-separated skills that match>",
-  "missing_skills": "<comma-separated important skills the candidate may lack>",
-  "cover_letter_hook": "<one compelling opening sentence for a cover letter>"
-}}"""
+async def prescreen_jobs_batch(jobs, resume_text, keywords, client):
+    """Cheap first-pass score for a batch of jobs; returns one match_score (or None on failure) per job."""
+    prompt = "\n\n".join(format_job(i + 1, job) for i, job in enumerate(jobs))
 
     try:
-        message = client.messages.create(
-            model="claude-opus-4-6",
-            max_tokens=600,
+        message = await client.messages.create(
+            model=PRESCREEN_MODEL,
+            max_tokens=80 * len(jobs),
+            system=build_system_prompt(resume_text, keywords, PRESCREEN_INSTRUCTIONS),
             messages=[{"role": "user", "content": prompt}]
         )
         response_text = message.content[0].text.strip()
+        scores = {int(job_id): int(score) for job_id, score in JOB_SCORE_RE.findall(response_text)}
+
+    except Exception as e:
+        log.warning(f"   ⚠️  Pre-screen error for batch starting with {jobs[0]['title']}: {e}")
+        scores = {}
+
+    return [scores.get(i + 1) for i in range(len(jobs))]
+
+
+def low_match_analysis(score, reason=LOW_MATCH_REASON):
+    """Analysis for a job Claude scored below the detail threshold, so no details were generated."""
+    return {**FALLBACK_ANALYSIS, "match_score": score, "recommendation": "Skip", "match_reasons": reason}
+
+
+def is_stale_stub(analysis, reason, cutoff):
+    """True for a cached detail-less analysis that, under the current thresholds, deserves a full look."""
+    return analysis.get("match_reasons") == reason and analysis.get("match_score", 0) >= cutoff
+
 
-        # Extract JSON safely
-        start = response_text.find("{")
-        end = response_text.rfind("}") + 1
-        return json.loads(response_text[start:end])
+async def score_jobs_batch(jobs, resume_text, keywords, client, detail_floor=0):
+    """Send a batch of jobs + resume to Claude in one request; returns one analysis per job, in order.
+
+    The response is streamed with every score up front: if the whole batch scores below
+    `detail_floor`, the generation is cancelled before any detailed analysis is written.
+    """
+    prompt = "\n\n".join(format_job(i + 1, job) for i, job in enumerate(jobs))
+    prompt += f"\n\nDetail threshold: {detail_floor}"
+
+    scores, results = {}, {}
+    try:
+        response_text = ""
+        aborted = False
+        async with client.messages.stream(
+            model=SCORE_MODEL,
+            max_tokens=600 * len(jobs),
+            system=build_system_prompt(resume_text, keywords),
+            messages=[{"role": "user", "content": prompt}]
+        ) as stream:
+            async for text in stream.text_stream:
+                response_text += text
+                if not scores and '"results"' in response_text:
+                    scores = {int(job_id): int(score) for job_id, score in JOB_SCORE_RE.findall(response_text)}
+                    if scores and max(scores.values()) < detail_floor:
+                        aborted = True
+                        break
+
+        if not aborted:
+            # Extract JSON safely
+            start = response_text.find("{")
+            end = response_text.rfind("}") + 1
+            data = orjson.loads(response_text[start:end])
+            scores = {s.get("job_id"): s.get("match_score", 0) for s in data.get("scores", [])}
+            results = {r.get("job_id"): r for r in data["results"]}
 
     except Exception as e:
-        print(f"   ⚠️  Claude error for {job['title']}: {e}")
-        return {
-            "match_score": 0,
-            "keyword_match": 0,
-            "recommendation": "Review Manually",
-            "match_reasons": "Could not analyze.",
-            "top_matching_skills": "",
-            "missing_skills": "",
-            "cover_letter_hook": ""
-        }
+        log.warning(f"   ⚠️  Claude error for batch starting with {jobs[0]['title']}: {e}")
+
+    analyses = []
+    for i, job in enumerate(jobs):
+        analysis = results.get(i + 1)
+        if analysis is not None:
+            analysis.pop("job_id", None)
+        elif scores.get(i + 1, detail_floor) < detail_floor:
+            analysis = low_match_analysis(scores[i + 1])
+        else:
+            analysis = dict(FALLBACK_ANALYSIS)
+        analyses.append(analysis)
+    return analyses
 
 
 # ─────────────────────────────────────────────
@@ -266,10 +562,9 @@ def build_email_html(scored_jobs, total_scraped):
         if score >= 60: return "#f39c12"
         return "#e74c3c"
 
-    rows = ""
-    for job in scored_jobs:
+    def render_row(job):
         color = score_color(job["match_score"])
-        rows += f"""
+        return f"""
         <tr>
           <td style="padding:14px 12px; border-bottom:1px solid #eee; vertical-align:top;">
             <a href="{job['url']}" style="font-weight:bold; font-size:15px; color:#2c3e50; text-decoration:none;">
@@ -296,6 +591,8 @@ def build_email_html(scored_jobs, total_scraped):
           </td>
         </tr>"""
 
+    rows = "".join(render_row(job) for job in scored_jobs)
+
     if not rows:
         rows = """<tr><td colspan="4" style="padding:30px; text-align:center; color:#999;">
             No jobs matched your minimum score today. Try lowering MIN_MATCH_SCORE.
@@ -359,9 +656,9 @@ def send_email(html_body, job_count, to_email, gmail_password):
         with smtplib.SMTP_SSL("smtp.gmail.com", 465) as server:
             server.login(from_email, gmail_password)
             server.sendmail(from_email, to_email, msg.as_string())
-        print(f"✅ Email sent to {to_email}")
+        log.info(f"✅ Email sent to {to_email}")
     except Exception as e:
-        print(f"❌ Email failed: {e}")
+        log.error(f"❌ Email failed: {e}")
         raise
 
 
@@ -369,59 +666,159 @@ def send_email(html_body, job_count, to_email, gmail_password):
 # MAIN
 # ─────────────────────────────────────────────
 
-def main():
-    print("=" * 50)
-    print("🚀 Job Search Automation Starting...")
-    print(f"   Keywords : {CONFIG['keywords']}")
-    print(f"   Location : {CONFIG['location']}")
-    print(f"   Min Score: {CONFIG['min_match_score']}%")
-    print("=" * 50)
-
-    # 1. Scrape all platforms
-    all_jobs = []
-    all_jobs += scrape_remoteok(CONFIG["keywords"])
-    all_jobs += scrape_indeed(CONFIG["keywords"], CONFIG["location"])
-    all_jobs += scrape_linkedin(CONFIG["keywords"], CONFIG["location"])
-
-    # 2. Deduplicate
-    unique_jobs = deduplicate(all_jobs)
-    print(f"\n📋 Total unique jobs: {len(unique_jobs)}")
-
-    # 3. Fetch full descriptions (for non-RemoteOK jobs)
-    print("\n📄 Fetching full job descriptions...")
-    for i, job in enumerate(unique_jobs):
-        if job["source"] != "RemoteOK" and not job["description"]:
-            print(f"   [{i+1}/{len(unique_jobs)}] {job['title']} @ {job['company']}")
-            job["description"] = fetch_job_description(job["url"], job["source"])
-
-    # 4. Score with Claude
-    print("\n🤖 Scoring jobs with Claude AI...")
-    client = anthropic.Anthropic(api_key=CONFIG["anthropic_api_key"])
-    scored_jobs = []
-
-    for i, job in enumerate(unique_jobs):
-        print(f"   [{i+1}/{len(unique_jobs)}] Analyzing: {job['title']} @ {job['company']}")
-        analysis = score_job_with_claude(job, CONFIG["resume_text"], CONFIG["keywords"], client)
-        time.sleep(1)  # avoid rate limiting
-
-        combined = {**job, **analysis}
-        if combined.get("match_score", 0) >= CONFIG["min_match_score"]:
-            scored_jobs.append(combined)
-            print(f"   ✅ Score: {combined['match_score']}% — {combined['recommendation']}")
+def setup_logging():
+    """Log through a queue so writes to stderr happen on a background thread, off the event loop."""
+    handler = logging.StreamHandler()
+    handler.setFormatter(logging.Formatter("%(message)s"))
+    log_queue = queue.Queue(-1)
+    log.addHandler(QueueHandler(log_queue))
+    log.setLevel(logging.INFO)
+    listener = QueueListener(log_queue, handler)
+    listener.start()
+    return listener
+
+
+async def main():
+    log.info("=" * 50)
+    log.info("🚀 Job Search Automation Starting...")
+    log.info(f"   Keywords : {CONFIG['keywords']}")
+    log.info(f"   Location : {CONFIG['location']}")
+    log.info(f"   Min Score: {CONFIG['min_match_score']}%")
+    log.info("=" * 50)
+
+    connector = aiohttp.TCPConnector(limit=20)
+    timeout = aiohttp.ClientTimeout(total=15)
+    async with aiohttp.ClientSession(connector=connector, timeout=timeout, headers=HEADERS) as session:
+        # 1. Scrape all platforms concurrently
+        results = await asyncio.gather(
+            scrape_remoteok(session, CONFIG["keywords"]),
+            scrape_indeed(session, CONFIG["keywords"], CONFIG["location"]),
+            scrape_linkedin(session, CONFIG["keywords"], CONFIG["location"]),
+        )
+        all_jobs = [job for jobs in results for job in jobs]
+
+        # 2. Deduplicate
+        unique_jobs = remove_near_duplicates(deduplicate(all_jobs))
+        log.info(f"\n📋 Total unique jobs: {len(unique_jobs)}")
+
+        # 3. Fetch full descriptions (for non-RemoteOK jobs) concurrently, reusing recent fetches
+        log.info("\n📄 Fetching full job descriptions...")
+        with open_cache("pages") as page_cache:
+            pending = []
+            for i, job in enumerate(unique_jobs):
+                if job["source"] != "RemoteOK" and not job["description"]:
+                    cached = cache_get(page_cache, job["url"]) if job["url"] else None
+                    if cached:
+                        job["description"] = cached
+                        continue
+                    log.info(f"   [{i+1}/{len(unique_jobs)}] {job['title']} @ {job['company']}")
+                    pending.append(job)
+            descriptions = await asyncio.gather(
+                *[fetch_job_description(session, job["url"], job["source"]) for job in pending]
+            )
+            for job, description in zip(pending, descriptions):
+                job["description"] = description
+                if description:
+                    cache_set(page_cache, job["url"], description, PAGE_CACHE_TTL)
+
+        # Now that every job has its full description, catch the reposts the first pass couldn't see
+        unique_jobs = remove_near_duplicates(unique_jobs)
+
+    # 3b. Drop the least resume-like jobs before spending Claude calls on them
+    total_scraped = len(unique_jobs)
+    unique_jobs = prefilter_by_similarity(unique_jobs, CONFIG["resume_text"], CONFIG["prefilter_keep_ratio"])
+    log.info(f"\n🧹 Pre-filter kept {len(unique_jobs)}/{total_scraped} jobs most similar to your resume")
+
+    # 4. Score with Claude in concurrent batches: cheap pre-screen, then detailed analysis
+    #    (rate-limit 429s are retried with backoff by the SDK)
+    log.info("\n🤖 Scoring jobs with Claude AI...")
+    client = anthropic.AsyncAnthropic(api_key=CONFIG["anthropic_api_key"], max_retries=5)
+    semaphore = asyncio.Semaphore(CLAUDE_CONCURRENCY)
+
+    keys = [score_cache_key(job, CONFIG["resume_text"], CONFIG["keywords"]) for job in unique_jobs]
+
+    with open_cache("scores") as score_cache:
+        analyses = [cache_get(score_cache, key) for key in keys]
+        # Detail-less stubs were cached against the thresholds of an earlier run; re-score the
+        # ones that could now reach the digest (e.g. after MIN_MATCH_SCORE was lowered)
+        detail_floor = CONFIG["min_match_score"] - DETAIL_MARGIN
+        cutoff = CONFIG["min_match_score"] - PRESCREEN_MARGIN
+        analyses = [
+            None if analysis and (
+                is_stale_stub(analysis, LOW_MATCH_REASON, detail_floor)
+                or is_stale_stub(analysis, PRESCREEN_REASON, cutoff)
+            ) else analysis
+            for analysis in analyses
+        ]
+        pending = [i for i, analysis in enumerate(analyses) if analysis is None]
+        log.info(f"   {len(unique_jobs) - len(pending)} cached, {len(pending)} to analyze")
+
+        async def run_batches(indices, score_batch):
+            """Score unique_jobs[indices] in concurrent batches; returns {index: result}."""
+            batches = [indices[n:n + SCORE_BATCH_SIZE] for n in range(0, len(indices), SCORE_BATCH_SIZE)]
+
+            async def bounded(batch):
+                async with semaphore:
+                    return await score_batch([unique_jobs[i] for i in batch])
+
+            batch_results = await asyncio.gather(*[bounded(batch) for batch in batches])
+            return {i: result for batch, results in zip(batches, batch_results) for i, result in zip(batch, results)}
+
+        # Stage 1: cheap model pre-scores every job
+        log.info(f"   ⚡ Pre-screening {len(pending)} jobs with {PRESCREEN_MODEL}...")
+        quick_scores = await run_batches(
+            pending, lambda jobs: prescreen_jobs_batch(jobs, CONFIG["resume_text"], CONFIG["keywords"], client)
+        )
+        finalists = []
+        for i in pending:
+            if quick_scores[i] is None or quick_scores[i] >= cutoff:
+                finalists.append(i)
+                log.info(f"   [{i+1}/{len(unique_jobs)}] Analyzing: {unique_jobs[i]['title']} @ {unique_jobs[i]['company']}")
+            else:
+                analyses[i] = low_match_analysis(quick_scores[i], PRESCREEN_REASON)
+
+        # Stage 2: detailed analysis from the expensive model for finalists only
+        detailed = await run_batches(
+            finalists,
+            lambda jobs: score_jobs_batch(
+                jobs, CONFIG["resume_text"], CONFIG["keywords"], client,
+                detail_floor=detail_floor,
+            ),
+        )
+        for i, analysis in detailed.items():
+            analyses[i] = analysis
+
+        for i in pending:
+            if analyses[i] != FALLBACK_ANALYSIS:
+                cache_set(score_cache, keys[i], analyses[i], SCORE_CACHE_TTL)
+
+    # Threshold on the score column alone; only jobs that pass get merged into full dicts
+    scores = [analysis.get("match_score", 0) for analysis in analyses]
+    keep = []
+    for i, score in enumerate(scores):
+        if score >= CONFIG["min_match_score"]:
+            keep.append(i)
+            log.info(f"   ✅ {unique_jobs[i]['title']} @ {unique_jobs[i]['company']} — Score: {score}% — {analyses[i].get('recommendation', '')}")
         else:
-            print(f"   ⏭️  Score: {combined.get('match_score', 0)}% — below threshold, skipping")
+            log.info(f"   ⏭️  {unique_jobs[i]['title']} @ {unique_jobs[i]['company']} — Score: {score}% — below threshold, skipping")
 
     # 5. Sort by score
-    scored_jobs.sort(key=lambda x: x.get("match_score", 0), reverse=True)
-    print(f"\n🎯 {len(scored_jobs)} jobs passed the threshold")
+    keep.sort(key=scores.__getitem__, reverse=True)
+    scored_jobs = [{**unique_jobs[i], **analyses[i]} for i in keep]
+    log.info(f"\n🎯 {len(scored_jobs)} jobs passed the threshold")
 
     # 6. Build & send email
-    print("\n📧 Sending email digest...")
-    html = build_email_html(scored_jobs, len(unique_jobs))
-    send_email(html, len(scored_jobs), CONFIG["your_email"], CONFIG["gmail_app_password"])
+    log.info("\n📧 Sending email digest...")
+    body = build_email_html(scored_jobs, total_scraped)
+    send_email(body, len(scored_jobs), CONFIG["your_email"], CONFIG["gmail_app_password"])
 
-    print("\n✅ Done! Check your inbox.")
+    log.info("\n✅ Done! Check your inbox.")
 
 
 if __name__ == "__main__":
-    main()
+    listener = setup_logging()
+    try:
+        with asyncio.Runner(loop_factory=uvloop.new_event_loop if uvloop else None) as runner:
+            runner.run(main())
+    finally:
+        listener.stop()
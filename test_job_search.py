@@ -0,0 +1,57 @@
+from job_search import LOW_MATCH_REASON, PRESCREEN_REASON, is_stale_stub, low_match_analysis, remove_near_duplicates
+
+DESCRIPTION = (
+    "We are hiring a backend engineer to build and operate distributed systems in Python and Go. "
+    "You will own services end to end, from design reviews to on-call."
+)
+
+
+def job(title, company="Acme", description=""):
+    return {"title": title, "company": company, "description": description}
+
+
+def test_level_suffixes_without_descriptions_are_kept():
+    jobs = [
+        job("Software Engineer II"),
+        job("Software Engineer III"),
+        job("Data Engineer I"),
+        job("Data Engineer II"),
+        job("Senior Software Engineer - Backend"),
+        job("Senior Software Engineer - Backend II"),
+    ]
+    assert remove_near_duplicates(jobs) == jobs
+
+
+def test_level_suffix_with_description_on_one_side_is_kept():
+    jobs = [job("Software Engineer II", description=DESCRIPTION), job("Software Engineer III")]
+    assert remove_near_duplicates(jobs) == jobs
+
+
+def test_repost_keeps_longer_description():
+    short = job("Senior Software Engineer", description=DESCRIPTION)
+    longer = job("Senior Software Engineer.", description=DESCRIPTION + " Remote friendly.")
+    other = job("Data Scientist", description="Build forecasting models for the supply chain team.")
+    assert remove_near_duplicates([short, longer, other]) == [longer, other]
+
+
+def test_repost_keeps_first_when_it_is_longer():
+    longer = job("Senior Software Engineer", description=DESCRIPTION + " Remote friendly.")
+    short = job("Senior Software Engineer.", description=DESCRIPTION)
+    assert remove_near_duplicates([longer, short]) == [longer]
+
+
+def test_low_match_stub_is_stale_once_it_clears_the_cutoff():
+    stub = low_match_analysis(50)
+    assert not is_stale_stub(stub, LOW_MATCH_REASON, cutoff=60)
+    assert is_stale_stub(stub, LOW_MATCH_REASON, cutoff=45)
+
+
+def test_detailed_analysis_is_never_stale():
+    analysis = {**low_match_analysis(50), "match_reasons": "Strong Python background."}
+    assert not is_stale_stub(analysis, LOW_MATCH_REASON, cutoff=0)
+
+
+def test_prescreen_stub_uses_its_own_cutoff():
+    stub = low_match_analysis(52, PRESCREEN_REASON)
+    assert not is_stale_stub(stub, LOW_MATCH_REASON, cutoff=45)
+    assert is_stale_stub(stub, PRESCREEN_REASON, cutoff=50)